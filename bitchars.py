@@ -0,0 +1,68 @@
+"""二进制串（'1'/'0'）与双字符编码（如"结婚"）之间的互转"""
+
+
+def _byte_to_bit_table(one, zero, other):
+    """构建字节->位字符的映射表，无关字节映射为 other"""
+    table = bytearray(other * 256)
+    table[one] = ord('1')
+    table[zero] = ord('0')
+    return bytes(table)
+
+
+def _lane_tables(one_bytes, zero_bytes):
+    """
+    为编码中的每个字节位置构建查找表
+
+    返回:
+        (位字符->该位置字节的表, 该位置字节->位字符的表) 两个列表
+    """
+    if len(one_bytes) != len(zero_bytes) or any(a == b for a, b in zip(one_bytes, zero_bytes)):
+        raise ValueError("两个字符的编码长度必须相同，且每个字节位置都不相同")
+    to_lane = [bytes.maketrans(b'10', bytes([a, b])) for a, b in zip(one_bytes, zero_bytes)]
+    # 每个位置的无关字节映射为不同的字符，所有位置结果一致时才说明每个字符都合法
+    from_lane = [_byte_to_bit_table(a, b, bytes([ord('a') + i]))
+                 for i, (a, b) in enumerate(zip(one_bytes, zero_bytes))]
+    return to_lane, from_lane
+
+
+class BitChars:
+    """
+    用 bytes.translate 按字节位置查表完成互转，每个方向只需几次C层的整串操作
+
+    参数:
+        one: 表示1的字符
+        zero: 表示0的字符
+    """
+
+    def __init__(self, one, zero):
+        self.one = one
+        self.zero = zero
+        self._to_utf16, self._from_utf16 = _lane_tables(
+            one.encode('utf-16-le'), zero.encode('utf-16-le'))
+        _, self._from_utf8 = _lane_tables(one.encode('utf-8'), zero.encode('utf-8'))
+
+    def from_bits(self, binary_str):
+        """将由'1'/'0'组成的二进制串转换为字符编码"""
+        bits = binary_str.encode('ascii')
+        width = len(self._to_utf16)
+        utf16 = bytearray(len(bits) * width)
+        for i, table in enumerate(self._to_utf16):
+            utf16[i::width] = bits.translate(table)
+        return utf16.decode('utf-16-le')
+
+    def to_bits(self, encoded):
+        """将字符编码转换为由'1'/'0'组成的二进制串"""
+        return self._lanes_to_bits(encoded.encode('utf-16-le', 'surrogatepass'), self._from_utf16)
+
+    def utf8_to_bits(self, data):
+        """将字符编码的UTF-8字节直接转换为由'1'/'0'组成的二进制串，无需先解码为字符串"""
+        return self._lanes_to_bits(bytes(data), self._from_utf8)
+
+    def _lanes_to_bits(self, data, tables):
+        width = len(tables)
+        if len(data) % width:
+            raise ValueError(f'加密文本只能包含"{self.one}"和"{self.zero}"')
+        lanes = [data[i::width].translate(table) for i, table in enumerate(tables)]
+        if any(lane != lanes[0] for lane in lanes[1:]):
+            raise ValueError(f'加密文本只能包含"{self.one}"和"{self.zero}"')
+        return lanes[0].decode('ascii')
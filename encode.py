@@ -1,10 +1,37 @@
-import heapq
-from collections import Counter
-import pickle
-import base64
+import sys
+from collections import Counter, deque
+from functools import lru_cache
+
+from bitchars import BitChars
+
+# 解码查找表一次预读的最大位数，更长的编码退回按 (码长, 码值) 查找
+_TABLE_BITS = 12
+
+# 允许的最大码长：解码时每次最多补充64位预读，更长的编码无法解出
+# （码长超过64需要斐波那契级的字符频率分布，实际文本不会出现）
+_MAX_CODE_LENGTH = 64
+
+# 编码时每次处理的字符数，限制临时二进制串的大小
+_ENCODE_CHUNK = 1 << 14
+
+# 小字母表模式：字符不超过4种时，范式码长只有以下几种可能，用首字节中的模式号表示，
+# 无需保存编码表。模式0为通用编码表，模式1为只有一种字符（保存字符和重复次数）
+_TINY_LENGTHS = {
+    2: (1, 1),
+    3: (1, 2, 2),
+    4: (2, 2, 2, 2),
+    5: (1, 2, 3, 3),
+}
+_TINY_MODES = {lengths: mode for mode, lengths in _TINY_LENGTHS.items()}
+_SINGLE_CHAR_MODE = 1
+
+# 结=1, 婚=0
+_JIEHUN = BitChars('结', '婚')
 
 
 class HuffmanNode:
+    __slots__ = ('char', 'freq', 'left', 'right')
+
     def __init__(self, char, freq):
         self.char = char
         self.freq = freq
@@ -21,46 +48,303 @@ def build_huffman_tree(text):
         return None
 
     # 统计字符频率
-    frequency = Counter(text)
+    return _build_tree(Counter(text).items())
+
 
-    # 创建优先队列
-    heap = [HuffmanNode(char, freq) for char, freq in frequency.items()]
-    heapq.heapify(heap)
+def _build_tree(frequency_items):
+    """
+    根据 (字符, 频率) 序列构建哈夫曼树
+
+    使用双队列算法：叶子按频率排序后放入一个队列，合并出的节点频率单调不减，
+    按顺序追加到另一个队列，每次从两个队首取最小者即可，无需优先队列。
+    """
+    leaves = deque(sorted((HuffmanNode(char, freq) for char, freq in frequency_items),
+                          key=lambda node: node.freq))
+    merged_nodes = deque()
+
+    def pop_smallest():
+        # 频率相同时优先取叶子，使树的高度更小
+        if not merged_nodes or (leaves and leaves[0].freq <= merged_nodes[0].freq):
+            return leaves.popleft()
+        return merged_nodes.popleft()
 
     # 构建哈夫曼树
-    while len(heap) > 1:
-        left = heapq.heappop(heap)
-        right = heapq.heappop(heap)
+    while len(leaves) + len(merged_nodes) > 1:
+        left = pop_smallest()
+        right = pop_smallest()
 
         merged = HuffmanNode(None, left.freq + right.freq)
         merged.left = left
         merged.right = right
 
-        heapq.heappush(heap, merged)
-
-    return heap[0] if heap else None
+        merged_nodes.append(merged)
 
+    if merged_nodes:
+        return merged_nodes[0]
+    return leaves[0] if leaves else None
 
-def build_codes(root, current_code="", codes=None):
-    """从哈夫曼树构建编码表"""
-    if codes is None:
-        codes = {}
 
+def build_codes(root):
+    """从哈夫曼树构建范式哈夫曼编码表，编码以 (码值整数, 码长) 的形式保存"""
     if root is None:
-        return codes
+        return {}
+
+    # 迭代遍历哈夫曼树，只记录每个叶子的深度作为码长
+    lengths = {}
+    stack = [(root, 0)]
+    while stack:
+        node, depth = stack.pop()
+        if node.char is not None:
+            lengths[node.char] = depth or 1  # 只有一个字符时码长为1
+        else:
+            stack.append((node.left, depth + 1))
+            stack.append((node.right, depth + 1))
+
+    return _canonical_codes(sorted(lengths.items(), key=lambda item: (item[1], item[0])))
+
+
+def _canonical_codes(symbols):
+    """
+    按范式哈夫曼规则分配编码
+
+    参数:
+        symbols: 按 (码长, 字符) 排好序的 [(字符, 码长)] 列表
+
+    返回:
+        {字符: (码值, 码长)}，字典顺序与 symbols 相同
+    """
+    codes = {}
+    code = 0
+    prev_length = symbols[0][1] if symbols else 0
+    for char, length in symbols:
+        code <<= length - prev_length
+        codes[char] = (code, length)
+        code += 1
+        prev_length = length
+    return codes
+
+
+def _write_varint(out, value):
+    """以变长整数（每字节7位，最高位表示后续还有字节）写入非负整数"""
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data, pos):
+    """读取变长整数，返回 (数值, 新位置)"""
+    value = 0
+    shift = 0
+    while True:
+        if pos >= len(data):
+            raise ValueError("编码表解析失败，请检查加密数据是否完整")
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def _read_chars(data, pos, count):
+    """从UTF-8字节中读取 count 个字符，返回 (字符串, 新位置)"""
+    start = pos
+    for _ in range(count):
+        if pos >= len(data):
+            raise ValueError("编码表解析失败，请检查加密数据是否完整")
+        lead = data[pos]
+        pos += 1 if lead < 0x80 else 2 if lead < 0xE0 else 3 if lead < 0xF0 else 4
+    try:
+        chars = data[start:pos].decode('utf-8', 'surrogatepass')
+    except UnicodeDecodeError:
+        raise ValueError("编码表解析失败，请检查加密数据是否完整")
+    if len(chars) != count:
+        raise ValueError("编码表解析失败，请检查加密数据是否完整")
+    return chars, pos
+
+
+def _pack_codes(codes):
+    """
+    将编码表序列化为紧凑的字节序列
+
+    编码表是范式哈夫曼编码，只需保存每种码长的字符数和按范式顺序排列的字符即可还原码值。
+    格式: [最大码长:1字节][码长1..最大码长各自的字符数:varint][按范式顺序拼接的字符UTF-8字节]
+    UTF-8 本身可以自行分隔字符，无需再为每个字符保存长度。
+    """
+    max_length = max((length for _, length in codes.values()), default=0)
+    counts = [0] * (max_length + 1)
+    for _, length in codes.values():
+        counts[length] += 1
 
-    # 叶子节点
-    if root.char is not None:
-        codes[root.char] = current_code if current_code else "0"
-        return codes
+    out = bytearray([max_length])
+    for count in counts[1:]:
+        _write_varint(out, count)
+    out += ''.join(codes).encode('utf-8', 'surrogatepass')
+    return bytes(out)
 
-    # 递归构建
-    build_codes(root.left, current_code + "0", codes)
-    build_codes(root.right, current_code + "1", codes)
 
+def _unpack_codes(data):
+    """从字节序列还原编码表，返回 {字符: (码值, 码长)}"""
+    if not data:
+        raise ValueError("编码表解析失败，请检查加密数据是否完整")
+
+    max_length = data[0]
+    if max_length > _MAX_CODE_LENGTH:
+        raise ValueError("编码表解析失败，请检查加密数据是否完整")
+    pos = 1
+    lengths = []
+    for length in range(1, max_length + 1):
+        count, pos = _read_varint(data, pos)
+        # 每个字符至少占1字节，字符总数不可能超过剩余的字节数
+        if len(lengths) + count > len(data) - pos:
+            raise ValueError("编码表解析失败，请检查加密数据是否完整")
+        lengths.extend([length] * count)
+
+    try:
+        chars = data[pos:].decode('utf-8', 'surrogatepass')
+    except UnicodeDecodeError:
+        raise ValueError("编码表解析失败，请检查加密数据是否完整")
+
+    codes = _canonical_codes(list(zip(chars, lengths)))
+    # 字符数必须与码长数一致且不能重复，码值也不能超出码长
+    if len(chars) != len(lengths) or len(codes) != len(chars) or any(
+            code >> length for code, length in codes.values()):
+        raise ValueError("编码表解析失败，请检查加密数据是否完整")
     return codes
 
 
+@lru_cache(maxsize=128)
+def _codes_for(frequency_key):
+    """
+    按字符频率缓存编码表及其序列化结果，重复或字符分布相同的文本无需重建哈夫曼树
+
+    参数:
+        frequency_key: 按字符排序的 ((字符, 频率), ...) 元组
+
+    返回:
+        (codes, codes_bytes)
+    """
+    codes = build_codes(_build_tree(frequency_key))
+    return codes, _pack_codes(codes)
+
+
+def _encode_bits(text, codes):
+    """
+    把文本编码为紧凑的字节序列
+
+    逐块用 map + join 在C层拼出该块的二进制串并一次性转为字节，
+    临时二进制串的大小不超过一个块。
+
+    返回:
+        (bytes_data, nbits): 编码后的字节和有效位数（末尾不足一字节的部分以0补齐）
+    """
+    code_bits = {char: format(code, f'0{length}b') for char, (code, length) in codes.items()}
+    get_bits = code_bits.__getitem__
+
+    out = bytearray()
+    rest = ''
+    for start in range(0, len(text), _ENCODE_CHUNK):
+        bits = rest + ''.join(map(get_bits, text[start:start + _ENCODE_CHUNK]))
+        full = len(bits) & ~7
+        if full:
+            out += int(bits[:full], 2).to_bytes(full >> 3, 'big')
+        rest = bits[full:]
+
+    total_bits = len(out) * 8 + len(rest)
+    if rest:
+        out.append(int(rest, 2) << (8 - len(rest)))
+    return bytes(out), total_bits
+
+
+def _build_decode_table(codes, table_bits):
+    """
+    构建多字符解码查找表
+
+    表项以预读的 table_bits 位为下标，值为 (窗口内能完整解出的字符串, 消耗位数)；
+    单字符表 single 用于数据末尾，None 表示需要按更长的编码查找。
+    """
+    single = [None] * (1 << table_bits)
+    for char, (code, length) in codes.items():
+        if length <= table_bits:
+            # 以该编码为前缀的所有表项都指向同一个字符
+            shift = table_bits - length
+            start = code << shift
+            single[start:start + (1 << shift)] = [(char, length)] * (1 << shift)
+
+    table_mask = (1 << table_bits) - 1
+    table = []
+    for peek, entry in enumerate(single):
+        if entry is not None:
+            chars, used = entry
+            while True:
+                following = single[(peek << used) & table_mask]
+                if following is None or following[1] > table_bits - used:
+                    break
+                chars += following[0]
+                used += following[1]
+            entry = (chars, used)
+        table.append(entry)
+    return table, single
+
+
+def _decode_bits(data, nbits, codes):
+    """
+    用查找表解码 _encode_bits 生成的字节序列
+
+    每次预读 max_len 位，先用前 table_bits 位查表一次解出多个字符，
+    更长的编码再按 (码长, 码值) 查找，避免逐位拼接字符串和查字典。
+    """
+    if not codes:
+        if nbits:
+            raise ValueError("加密数据格式错误")
+        return ''
+
+    max_len = max(length for _, length in codes.values())
+    table_bits = min(max_len, _TABLE_BITS)
+    table, single = _build_decode_table(codes, table_bits)
+    long_codes = {(length, code): char for char, (code, length) in codes.items() if length > table_bits}
+
+    decoded = []
+    append = decoded.append
+    peek_mask = (1 << max_len) - 1
+    table_shift = max_len - table_bits
+    data = bytes(data) + bytes(8)  # 末尾补0，保证总能预读满8字节
+    acc = 0
+    acc_bits = 0
+    pos = 0
+    remaining = nbits
+    while remaining > 0:
+        # 预读位数不足时一次补充64位（码长不超过 _MAX_CODE_LENGTH，一次补充即可）
+        if acc_bits < max_len:
+            acc = ((acc & ((1 << acc_bits) - 1)) << 64) | int.from_bytes(data[pos:pos + 8], 'big')
+            pos += 8
+            acc_bits += 64
+        peek = (acc >> (acc_bits - max_len)) & peek_mask
+
+        entry = table[peek >> table_shift]
+        if entry is not None:
+            chars, length = entry
+            if length > remaining:
+                # 末尾补齐的0可能被多解出字符，改为逐个解码
+                chars, length = single[peek >> table_shift]
+        else:
+            for length in range(table_bits + 1, max_len + 1):
+                chars = long_codes.get((length, peek >> (max_len - length)))
+                if chars is not None:
+                    break
+            else:
+                raise ValueError("加密数据格式错误")
+
+        append(chars)
+        remaining -= length
+        acc_bits -= length
+
+    if remaining:
+        raise ValueError("加密数据格式错误")
+    return ''.join(decoded)
+
+
 def encrypt_text(text):
     """
     使用哈夫曼编码将文本加密为"结婚"编码
@@ -78,39 +362,35 @@ def encrypt_text(text):
     if not text:
         return "婚结"  # 使用两个字符表示空字符串，第一位表示非压缩，第二位是占位符
 
-    # 构建哈夫曼树和编码表
-    root = build_huffman_tree(text)
-    if root is None:
-        return "婚结"  # 空文本的情况
-
-    codes = build_codes(root)
-
-    # 使用哈夫曼编码压缩文本
-    encoded_bits = ''.join(codes[char] for char in text)
-
-    # 将编码表序列化
-    codes_serialized = pickle.dumps(codes)
-    codes_base64 = base64.b64encode(codes_serialized).decode('ascii')
-
-    # 将编码表转为二进制
-    codes_bits = ''.join(format(ord(c), '08b') for c in codes_base64)
-
-    # 编码表长度（32位）
-    codes_length = format(len(codes_bits), '032b')
-
-    # 组合：编码表长度 + 编码表 + 编码后的文本
-    full_bits = codes_length + codes_bits + encoded_bits
-
-    # 填充到8的倍数
-    padding = (8 - len(full_bits) % 8) % 8
-    full_bits += '0' * padding
+    frequency = Counter(text)
 
-    # 添加填充长度信息（3位，最多7）
-    padding_info = format(padding, '03b')
-    full_bits = padding_info + full_bits
+    # 组合（均按字节对齐）：首字节高3位为文本末尾的填充位数，中间3位为模式号，低2位保留为0
+    if len(frequency) == 1:
+        # 只有一种字符：首字节 + 字符 + 重复次数
+        (char, count), = frequency.items()
+        packed = bytearray([_SINGLE_CHAR_MODE << 2])
+        packed += char.encode('utf-8', 'surrogatepass')
+        _write_varint(packed, count)
+    else:
+        # 构建（或从缓存取得）编码表及其序列化字节
+        codes, codes_bytes = _codes_for(tuple(sorted(frequency.items())))
+
+        # 使用哈夫曼编码压缩文本
+        encoded_bytes, encoded_length = _encode_bits(text, codes)
+        padding = len(encoded_bytes) * 8 - encoded_length
+
+        mode = _TINY_MODES.get(tuple(length for _, length in codes.values()), 0)
+        if mode:
+            # 小字母表：首字节 + 按范式顺序拼接的字符 + 编码后的文本
+            packed = bytes([padding << 5 | mode << 2]) + ''.join(codes).encode('utf-8', 'surrogatepass')
+        else:
+            # 通用模式：首字节 + 编码表字节数（3字节）+ 编码表 + 编码后的文本
+            packed = bytes([padding << 5]) + len(codes_bytes).to_bytes(3, 'big') + codes_bytes
+        packed += encoded_bytes
+    full_bits = format(int.from_bytes(packed, 'big'), f'0{len(packed) * 8}b')
 
     # 转换为"结婚"编码
-    encrypted = full_bits.replace('1', '结').replace('0', '婚')
+    encrypted = _JIEHUN.from_bits(full_bits)
 
     return encrypted
 
@@ -133,60 +413,49 @@ def decrypt_text(encrypted):
         return ""  # 空字符串的特殊表示
 
     # 转换回二进制
-    bits = encrypted.replace('结', '1').replace('婚', '0')
+    bits = _JIEHUN.to_bits(encrypted)
 
-    # 读取填充信息
-    if len(bits) < 3:
+    # 数据按字节对齐，一次性打包为字节后直接按字节读取各字段
+    if len(bits) < 8 or len(bits) % 8:
         raise ValueError("加密数据格式错误")
-    padding = int(bits[:3], 2)
-    bits = bits[3:]
+    packed = int(bits, 2).to_bytes(len(bits) // 8, 'big')
 
-    # 移除填充
-    if padding > 0:
-        if len(bits) < padding:
-            raise ValueError("加密数据格式错误")
-        bits = bits[:-padding]
-
-    # 读取编码表长度
-    if len(bits) < 32:
-        raise ValueError("加密数据格式错误")
-    codes_length = int(bits[:32], 2)
-    bits = bits[32:]
-
-    # 提取编码表和编码后的文本
-    if len(bits) < codes_length:
+    # 读取首字节中的填充信息和模式号
+    padding = packed[0] >> 5
+    mode = (packed[0] >> 2) & 0x07
+    if packed[0] & 0x03 or mode > max(_TINY_LENGTHS):
         raise ValueError("加密数据格式错误")
-    codes_bits = bits[:codes_length]
-    encoded_bits = bits[codes_length:]
 
-    # 将编码表转回字符串
-    codes_chars = []
-    for i in range(0, len(codes_bits), 8):
-        byte = codes_bits[i:i+8]
-        if len(byte) == 8:
-            codes_chars.append(chr(int(byte, 2)))
-    codes_base64 = ''.join(codes_chars)
-
-    try:
-        # 反序列化编码表
-        codes_serialized = base64.b64decode(codes_base64)
-        codes = pickle.loads(codes_serialized)
-    except Exception:
-        raise ValueError("编码表解析失败，请检查加密数据是否完整")
-
-    # 构建反向编码表
-    reverse_codes = {v: k for k, v in codes.items()}
-
-    # 解码文本
-    decoded_text = []
-    current_code = ""
-    for bit in encoded_bits:
-        current_code += bit
-        if current_code in reverse_codes:
-            decoded_text.append(reverse_codes[current_code])
-            current_code = ""
+    if mode == _SINGLE_CHAR_MODE:
+        # 只有一种字符：读取字符和重复次数
+        char, pos = _read_chars(packed, 1, 1)
+        count, pos = _read_varint(packed, pos)
+        # 重复次数即原文长度，不可能超过 sys.maxsize
+        if padding or not 1 <= count <= sys.maxsize or pos != len(packed):
+            raise ValueError("加密数据格式错误")
+        return char * count
+
+    if mode:
+        # 小字母表：码长由模式号决定，只需读取字符
+        lengths = _TINY_LENGTHS[mode]
+        chars, pos = _read_chars(packed, 1, len(lengths))
+        codes = _canonical_codes(list(zip(chars, lengths)))
+        if len(codes) != len(lengths):
+            raise ValueError("编码表解析失败，请检查加密数据是否完整")
+    else:
+        # 通用模式：读取编码表字节数并反序列化编码表
+        codes_size = int.from_bytes(packed[1:4], 'big')
+        pos = 4 + codes_size
+        if len(packed) < pos:
+            raise ValueError("加密数据格式错误")
+        codes = _unpack_codes(packed[4:pos])
 
-    return ''.join(decoded_text)
+    # 查表解码文本
+    encoded_bytes = packed[pos:]
+    encoded_length = len(encoded_bytes) * 8 - padding
+    if encoded_length < 0:
+        raise ValueError("加密数据格式错误")
+    return _decode_bits(encoded_bytes, encoded_length, codes)
 
 # 使用示例
 if __name__ == "__main__":
@@ -255,13 +524,14 @@ if __name__ == "__main__":
     codes = build_codes(root)
     print(f"\n哈夫曼编码:")
     for char in sorted(codes.keys()):
-        print(f"  '{char}': {codes[char]} ({len(codes[char])} 位)")
+        code, length = codes[char]
+        print(f"  '{char}': {code:0{length}b} ({length} 位)")
     
     print(f"\n加密后长度: {len(encrypted)} 个'结婚'字符")
     print(f"压缩比率: {len(encrypted) / len(example):.2f}x")
     print(f"解密验证: {'✓ 成功' if example == decrypted else '✗ 失败'}")
     
     # 理论分析
-    avg_bits = sum(len(codes[c]) * freq[c] for c in freq) / len(example)
+    avg_bits = sum(codes[c][1] * freq[c] for c in freq) / len(example)
     print(f"\n理论平均编码长度: {avg_bits:.2f} 位/字符")
     print(f"相比固定8位编码节省: {(1 - avg_bits/8) * 100:.1f}%")
\ No newline at end of file
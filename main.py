@@ -1,5 +1,50 @@
+import threading
 import zlib
 
+from bitchars import BitChars
+
+# 复用同一个压缩器，避免每次加密都重新初始化deflate状态；每条消息以 Z_FULL_FLUSH 结束，
+# 压缩状态随之重置，因此每条消息都可以单独解压
+_compressor = zlib.compressobj(9, zlib.DEFLATED, -15)
+_compressor_lock = threading.Lock()
+
+# Z_FULL_FLUSH 在输出末尾固定追加的同步标记，压缩时去掉，解压时补回（同 RFC 7692 的做法）
+_SYNC_MARKER = b'\x00\x00\xff\xff'
+# 解压时追加的空结束块，用于确认数据完整地结束在同步点上
+_FINAL_BLOCK = b'\x03\x00'
+# 压缩数据末尾的CRC32校验字节数（原始deflate不含adler32，由它检测数据损坏）
+_CHECKSUM_SIZE = 4
+
+# 结=1, 婚=0
+_JIEHUN = BitChars('结', '婚')
+
+
+def _compress(data):
+    """
+    使用最高压缩级别的原始deflate（不含zlib头）压缩数据，
+    末尾附加原始数据的CRC32（4字节，大端）用于解压时检测数据损坏
+    """
+    with _compressor_lock:
+        compressed = _compressor.compress(data) + _compressor.flush(zlib.Z_FULL_FLUSH)
+    if compressed.endswith(_SYNC_MARKER):
+        compressed = compressed[:-len(_SYNC_MARKER)]
+    return compressed + zlib.crc32(data).to_bytes(_CHECKSUM_SIZE, 'big')
+
+
+def _decompress(data):
+    """解压 _compress 生成的数据并校验CRC32，兼容最初版本带zlib头（adler32校验）的数据"""
+    compressed, checksum = data[:-_CHECKSUM_SIZE], data[-_CHECKSUM_SIZE:]
+    decompressor = zlib.decompressobj(-15)
+    try:
+        # 完整的数据应恰好在追加的结束块处结束
+        result = decompressor.decompress(compressed + _SYNC_MARKER + _FINAL_BLOCK)
+        if (decompressor.eof and not decompressor.unused_data
+                and zlib.crc32(result).to_bytes(_CHECKSUM_SIZE, 'big') == checksum):
+            return result
+    except zlib.error:
+        pass
+    return zlib.decompress(data)
+
 
 def encrypt_text(text, use_compression=True):
     """
@@ -21,13 +66,13 @@ def encrypt_text(text, use_compression=True):
 
     # 如果启用压缩，先压缩数据
     if use_compression:
-        bytes_data = zlib.compress(bytes_data)
+        bytes_data = _compress(bytes_data)
 
-    # 将每个字节转换为8位二进制
-    binary_str = ''.join(format(byte, '08b') for byte in bytes_data)
+    # 将整个字节序列一次性转换为二进制（每字节8位，高位补0）
+    binary_str = format(int.from_bytes(bytes_data, 'big'), f'0{len(bytes_data) * 8}b') if bytes_data else ''
 
     # 将二进制转换为"结婚"编码
-    encrypted = binary_str.replace('1', '结').replace('0', '婚')
+    encrypted = _JIEHUN.from_bits(binary_str)
 
     # 添加标记位表示是否压缩（第一个字符）
     marker = '结' if use_compression else '婚'
@@ -54,21 +99,18 @@ def decrypt_text(encrypted):
     encrypted_data = encrypted[1:]
 
     # 将"结婚"编码转换为二进制
-    binary_str = encrypted_data.replace('结', '1').replace('婚', '0')
-
-    # 将二进制转换回字节
-    bytes_data = []
-    for i in range(0, len(binary_str), 8):
-        byte = binary_str[i:i+8]
-        if len(byte) == 8:
-            bytes_data.append(int(byte, 2))
+    binary_str = _JIEHUN.to_bits(encrypted_data)
 
-    bytes_result = bytes(bytes_data)
+    # 将二进制一次性转换回字节（丢弃末尾不足8位的部分）
+    byte_count = len(binary_str) // 8
+    if len(binary_str) != byte_count * 8:
+        binary_str = binary_str[:byte_count * 8]
+    bytes_result = int(binary_str, 2).to_bytes(byte_count, 'big') if byte_count else b''
 
     # 如果是压缩的，先解压
     if is_compressed:
         try:
-            bytes_result = zlib.decompress(bytes_result)
+            bytes_result = _decompress(bytes_result)
         except zlib.error:
             raise ValueError("解压缩失败，请检查加密数据是否完整")
 
@@ -1,5 +1,16 @@
+from bitchars import BitChars
+
 rule = "结婚"
 
+# rule[0]=1, rule[1]=0
+_RULE = BitChars(rule[0], rule[1])
+
+# 每个字节对应的8个rule字符的UTF-8编码（高位在前）
+_ONE_UTF8 = rule[0].encode('utf-8')
+_ZERO_UTF8 = rule[1].encode('utf-8')
+_BYTE_TO_UTF8 = [b''.join(_ONE_UTF8 if (byte >> i) & 1 else _ZERO_UTF8 for i in range(7, -1, -1))
+                 for byte in range(256)]
+
 
 def encrypt_text(text):
     """
@@ -18,15 +29,33 @@ def encrypt_text(text):
     # 将文本转换为UTF-8字节序列
     bytes_data = text.encode('utf-8')
 
-    # 将每个字节转换为8位二进制
-    binary_str = ''.join(format(byte, '08b') for byte in bytes_data)
+    # 将整个字节序列一次性转换为二进制（每字节8位，高位补0）
+    binary_str = format(int.from_bytes(bytes_data, 'big'), f'0{len(bytes_data) * 8}b') if bytes_data else ''
 
     # 将二进制转换为"结婚"编码
-    encrypted = binary_str.replace('1', rule[0]).replace('0', rule[1])
+    encrypted = _RULE.from_bits(binary_str)
 
     return encrypted
 
 
+def encrypt_text_to_bytes(text):
+    """
+    将文本加密为"结婚"编码的UTF-8字节，等价于 encrypt_text(text).encode('utf-8')
+
+    每个字节直接查表得到8个字符的UTF-8编码，不构造中间字符串，适合直接写入网络。
+
+    参数:
+        text: 要加密的文本字符串
+
+    返回:
+        加密后字符串的UTF-8字节
+    """
+    if not isinstance(text, str):
+        raise TypeError("输入必须是字符串类型")
+
+    return b''.join(map(_BYTE_TO_UTF8.__getitem__, text.encode('utf-8')))
+
+
 def decrypt_text(encrypted):
     """
     将"结婚"编码解密为原文本
@@ -42,21 +71,50 @@ def decrypt_text(encrypted):
         raise ValueError("加密文本必须是非空字符串")
 
     # 将"结婚"编码转换为二进制
-    binary_str = encrypted.replace(rule[0], '1').replace(rule[1], '0')
+    binary_str = _RULE.to_bits(encrypted)
 
-    # 将二进制转换回字节
-    bytes_data = []
-    for i in range(0, len(binary_str), 8):
-        byte = binary_str[i:i+8]
-        if len(byte) == 8:  # 确保是完整的字节
-            bytes_data.append(int(byte, 2))
+    # 将二进制一次性转换回字节
+    byte_count = len(binary_str) // 8
+    if len(binary_str) != byte_count * 8:  # 确保是完整的字节
+        binary_str = binary_str[:byte_count * 8]
+    bytes_data = int(binary_str, 2).to_bytes(byte_count, 'big') if byte_count else b''
 
     # 将字节序列解码为UTF-8文本
     try:
-        return bytes(bytes_data).decode('utf-8')
+        return bytes_data.decode('utf-8')
     except UnicodeDecodeError:
         raise ValueError("解码失败，请检查加密数据是否完整")
 
+
+def decrypt_bytes(data):
+    """
+    将"结婚"编码的UTF-8字节解密为原文本，是 encrypt_text_to_bytes 的逆过程
+
+    参数:
+        data: 加密后字符串的UTF-8字节
+
+    返回:
+        解密后的原始文本
+    """
+    if not isinstance(data, (bytes, bytearray, memoryview)) or len(data) < 1:
+        raise ValueError("加密数据必须是非空字节串")
+
+    # 按UTF-8编码中的位置分别查表，直接在字节上得到二进制串，无需先解码为字符串
+    binary_str = _RULE.utf8_to_bits(data)
+
+    # 将二进制一次性转换回字节，末尾不足8位的部分与 decrypt_text 一样忽略
+    byte_count = len(binary_str) // 8
+    if len(binary_str) != byte_count * 8:
+        binary_str = binary_str[:byte_count * 8]
+    bytes_data = int(binary_str, 2).to_bytes(byte_count, 'big') if byte_count else b''
+
+    # 将字节序列解码为UTF-8文本
+    try:
+        return bytes_data.decode('utf-8')
+    except UnicodeDecodeError:
+        raise ValueError("解码失败，请检查加密数据是否完整")
+
+
 # 使用示例
 if __name__ == "__main__":
     # 测试加密
@@ -103,4 +161,4 @@ if __name__ == "__main__":
     for test in test_cases:
         enc = encrypt_text(test)
         dec = decrypt_text(enc)
-        print(f"{test} -> 长度{len(enc)} -> {dec} ({'✓' if test == dec else '✗'})")
\ No newline at end of file
+        print(f"{test} -> 长度{len(enc)} -> {dec} ({'✓' if test == dec else '✗'})")